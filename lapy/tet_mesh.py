@@ -4,6 +4,53 @@ from scipy import sparse
 from . import _tet_io as io
 
 
+def _tet_volumes(v, t):
+    """Compute six times the signed volume of each tetrahedron.
+
+    Parameters
+    ----------
+    v : array
+        Array of shape (n, 3) with vertex coordinates.
+    t : array
+        Array of shape (m, 4) with tetrahedron vertex indices.
+
+    Returns
+    -------
+    vol : array
+        Array of shape (m,), positive for correctly oriented tetras.
+    """
+    t0 = t[:, 0]
+    t1 = t[:, 1]
+    t2 = t[:, 2]
+    t3 = t[:, 3]
+    # gather each coordinate separately to avoid strided (m,3) temporaries
+    vx, vy, vz = v.T
+    x0, y0, z0 = vx[t0], vy[t0], vz[t0]
+    e0x, e0y, e0z = vx[t1], vy[t1], vz[t1]
+    e2x, e2y, e2z = vx[t2], vy[t2], vz[t2]
+    e3x, e3y, e3z = vx[t3], vy[t3], vz[t3]
+    # subtract in place on the freshly gathered arrays
+    for e in (e0x, e2x, e3x):
+        e -= x0
+    for e in (e0y, e2y, e3y):
+        e -= y0
+    for e in (e0z, e2z, e3z):
+        e -= z0
+    # triple product e3 . (e0 x e2), accumulated without (m,3) temporaries
+    vol = e0y * e2z
+    vol -= e0z * e2y
+    vol *= e3x
+    tmp = e0z * e2x
+    tmp -= e0x * e2z
+    tmp *= e3y
+    vol += tmp
+    np.multiply(e0x, e2y, out=tmp)
+    tmp -= e0y * e2x
+    tmp *= e3z
+    vol += tmp
+    return vol
+
+
 class TetMesh:
     """Class representing a tetraheral mesh.
 
@@ -19,6 +66,10 @@ class TetMesh:
         Ordering is important: so that t0, t1, t2 are oriented
         counterclockwise when looking from above, and t3 is
         on top of that triangle.
+    validate : bool
+        Whether to check that all indices in ``t`` refer to vertices in ``v``
+        (default True). Can be disabled for large meshes that are known to be
+        valid.
 
     Notes
     -----
@@ -27,15 +78,36 @@ class TetMesh:
     and `VTK <https://examples.vtk.org/site/VTKFileFormats/>`_ files.
     """
 
-    def __init__(self, v, t):
-        self.v = np.array(v)
-        self.t = np.array(t)
-        vnum = np.max(self.v.shape)
-        if np.max(self.t) >= vnum:
+    def __init__(self, v, t, validate=True):
+        # avoid copies for array input, t is only copied if it is downcast
+        self.v = np.asarray(v)
+        self.t = np.asarray(t)
+        vnum = self.v.shape[0]
+        if not np.issubdtype(self.t.dtype, np.integer):
+            raise ValueError("Tetra indices should be integers")
+        if validate and np.max(self.t) >= vnum:
             raise ValueError("Max index exceeds number of vertices")
+        # use 32 bit indices whenever they can address all vertices
+        if vnum <= np.iinfo(np.int32).max:
+            self.t = self.t.astype(np.int32, copy=False)
         # put more checks here (e.g. the dim 3 conditions on columns)
         # self.orient_()
-        self.adj_sym = self.construct_adj_sym()
+        # adjacency matrix is constructed on first access
+        self._adj_sym = None
+
+    @property
+    def adj_sym(self):
+        """Symmetric adjacency matrix as csr sparse matrix.
+
+        Constructed on first access, see `construct_adj_sym`.
+        """
+        if self._adj_sym is None:
+            self._adj_sym = self.construct_adj_sym()
+        return self._adj_sym
+
+    @adj_sym.setter
+    def adj_sym(self, adj):
+        self._adj_sym = adj
 
     @classmethod
     def read_gmsh(cls, filename):
@@ -89,21 +161,32 @@ class TetMesh:
 
         Returns
         -------
-        adj : csc_matrix
-            Symmetric adjacency matrix as csc sparse matrix.
+        adj : csr_matrix
+            Symmetric adjacency matrix as csr sparse matrix.
         """
-        t1 = self.t[:, 0]
-        t2 = self.t[:, 1]
-        t3 = self.t[:, 2]
-        t4 = self.t[:, 3]
-        i = np.column_stack((t1, t2, t2, t3, t3, t1, t1, t2, t3, t4, t4, t4)).reshape(
-            -1
+        # pack each (i,j) pair into a single key, sort once and count runs,
+        # so that the sparse matrix can be assembled without summing duplicates.
+        # Keys are written block-wise into one buffer, each of the 6 edges
+        # once, the transpose is added below.
+        n = self.v.shape[0]
+        nt = self.t.shape[0]
+        keys = np.empty(6 * nt, dtype=np.int64)
+        for k, (a, b) in enumerate(((0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3))):
+            block = keys[k * nt : (k + 1) * nt]
+            np.multiply(self.t[:, a], n, out=block, dtype=np.int64)
+            block += self.t[:, b]
+        keys.sort()
+        mask = np.empty(keys.shape, dtype=bool)
+        mask[:1] = True
+        mask[1:] = keys[1:] != keys[:-1]
+        ukeys = keys[mask]
+        counts = np.diff(np.append(np.flatnonzero(mask), keys.size))
+        # keys are sorted by row, then column, so this is already CSR order
+        indptr = np.searchsorted(ukeys // n, np.arange(n + 1))
+        adj = sparse.csr_matrix(
+            (counts.astype(np.float64), ukeys % n, indptr), shape=(n, n)
         )
-        j = np.column_stack((t2, t1, t3, t2, t1, t3, t4, t4, t4, t1, t2, t3)).reshape(
-            -1
-        )
-        adj = sparse.csc_matrix((np.ones(i.shape), (i, j)))
-        return adj
+        return adj + adj.T
 
     def has_free_vertices(self):
         """Check if the vertex list has more vertices than what is used in tetra.
@@ -115,10 +198,29 @@ class TetMesh:
         bool
             Whether vertex list has more vertices than tetra or not.
         """
-        vnum = np.max(self.v.shape)
-        vnumt = len(np.unique(self.t.reshape(-1)))
+        vnum = self.v.shape[0]
+        vnumt = np.count_nonzero(self._used_vertex_mask())
         return vnum != vnumt
 
+    def _used_vertex_mask(self, t=None):
+        """Get mask of vertices that are used in at least one tetra.
+
+        Parameters
+        ----------
+        t : array | None
+            Array of vertex indices to check instead of the tetras (optional).
+
+        Returns
+        -------
+        array
+            Boolean array of length ``len(v)``, True for used vertices.
+        """
+        if t is None:
+            t = self.t
+        vused = np.zeros(self.v.shape[0], dtype=bool)
+        vused[t.reshape(-1)] = True
+        return vused
+
     def is_oriented(self):
         """Check if tet mesh is oriented.
 
@@ -131,28 +233,20 @@ class TetMesh:
         oriented: bool
             True if ``max(adj_directed)=1``.
         """
-        # Compute vertex coordinates and a difference vector for each triangle:
-        t0 = self.t[:, 0]
-        t1 = self.t[:, 1]
-        t2 = self.t[:, 2]
-        t3 = self.t[:, 3]
-        v0 = self.v[t0, :]
-        v1 = self.v[t1, :]
-        v2 = self.v[t2, :]
-        v3 = self.v[t3, :]
-        e0 = v1 - v0
-        e2 = v2 - v0
-        e3 = v3 - v0
-        # Compute cross product and 6 * vol for each triangle:
-        cr = np.cross(e0, e2)
-        vol = np.sum(e3 * cr, axis=1)
-        if np.max(vol) < 0.0:
+        # Compute 6 * vol for each tetra:
+        vol = _tet_volumes(self.v, self.t)
+        if vol.size == 0:
+            print("Mesh has no tetrahedra")
+            return False
+        # a single reduction over the signs detects the uniform cases
+        sgnsum = np.sum(np.sign(vol))
+        if sgnsum == -vol.size:
             print("All tet orientations are flipped")
             return False
-        elif np.min(vol) > 0.0:
+        elif sgnsum == vol.size:
             print("All tet orientations are correct")
             return True
-        elif np.count_nonzero(vol) < len(vol):
+        elif np.count_nonzero(vol) < vol.size:
             print("We have degenerated zero-volume tetrahedra")
             return False
         else:
@@ -169,12 +263,15 @@ class TetMesh:
         """
         # get only upper off-diag elements from symmetric adj matrix
         triadj = sparse.triu(self.adj_sym, 1, format="coo")
+        vx, vy, vz = self.v.T
         edgelens = np.sqrt(
-            ((self.v[triadj.row, :] - self.v[triadj.col, :]) ** 2).sum(1)
+            (vx[triadj.row] - vx[triadj.col]) ** 2
+            + (vy[triadj.row] - vy[triadj.col]) ** 2
+            + (vz[triadj.row] - vz[triadj.col]) ** 2
         )
         return edgelens.mean()
 
-    def boundary_tria(self, tetfunc=None):
+    def boundary_tria(self, tetfunc=None, compact=False):
         """Get boundary triangle mesh of tetrahedra.
 
         It can have multiple connected components.
@@ -182,6 +279,7 @@ class TetMesh:
         so that the tria indices agree with the tet-mesh, in case we want to
         transfer information back, e.g. a FEM boundary condition, or to access
         a TetMesh vertex function with TriaMesh.t indices.
+        Pass ``compact=True`` to only keep the vertices of the boundary instead.
 
         .. warning::
 
@@ -192,6 +290,9 @@ class TetMesh:
         ----------
         tetfunc : array | None
             List of tetra function values (optional).
+        compact : bool
+            Whether to remove all vertices that are not on the boundary and
+            reindex the triangles accordingly (default False).
 
         Returns
         -------
@@ -202,30 +303,57 @@ class TetMesh:
         """
         from . import TriaMesh
 
-        # get all triangles
-        allt = np.vstack(
-            (
-                self.t[:, np.array([3, 1, 2])],
-                self.t[:, np.array([2, 0, 3])],
-                self.t[:, np.array([1, 3, 0])],
-                self.t[:, np.array([0, 2, 1])],
+        # get all triangles, interleaved so that row k belongs to tetra k // 4
+        nt = self.t.shape[0]
+        allt = np.empty((4 * nt, 3), dtype=self.t.dtype)
+        for k, face in enumerate(((3, 1, 2), (2, 0, 3), (1, 3, 0), (0, 2, 1))):
+            for c, idx in enumerate(face):
+                allt[k::4, c] = self.t[:, idx]
+        # sort rows so that faces are reorder in ascending order of indices,
+        # using a 3-element sorting network instead of a generic row sort
+        lo = np.minimum(allt[:, 0], allt[:, 1])
+        hi = np.maximum(allt[:, 0], allt[:, 1])
+        a2 = np.maximum(hi, allt[:, 2])
+        hi = np.minimum(hi, allt[:, 2])
+        a0 = np.minimum(lo, hi)
+        a1 = np.maximum(lo, hi)
+        # hash each sorted row into a single key (1D sort is much faster than
+        # row-wise sort), as long as the keys cannot overflow int64
+        n = self.v.shape[0]
+        if n <= 2**21:
+            a0 = a0.astype(np.int64)
+            keys = (a0 * n + a1) * n + a2
+            perm = np.argsort(keys, kind="stable")
+            keys = keys[perm]
+            newkey = keys[1:] != keys[:-1]
+        else:
+            perm = np.lexsort((a2, a1, a0))
+            newkey = (
+                (a0[perm[1:]] != a0[perm[:-1]])
+                | (a1[perm[1:]] != a1[perm[:-1]])
+                | (a2[perm[1:]] != a2[perm[:-1]])
             )
-        )
-        # sort rows so that faces are reorder in ascending order of indices
-        allts = np.sort(allt, axis=1)
-        # find unique trias without a neighbor
-        tria, indices, count = np.unique(
-            allts, axis=0, return_index=True, return_counts=True
-        )
-        tria = allt[indices[count == 1]]
+        # find trias without a neighbor, i.e. sorted keys that occur only once
+        single = np.ones(4 * nt, dtype=bool)
+        single[1:] &= newkey
+        single[:-1] &= newkey
+        sel = perm[single]
+        tria = allt[sel]
         print("Found " + str(np.size(tria, 0)) + " triangles on boundary.")
+        v = self.v
+        if compact:
+            # keep only boundary vertices and reindex tria
+            vkeep = self._used_vertex_mask(tria)
+            tlookup = np.cumsum(vkeep, dtype=tria.dtype) - 1
+            tria = tlookup[tria]
+            v = v[vkeep, :]
         # if we have tetra function, map these to the boundary triangles
         if tetfunc is not None:
-            alltidx = np.tile(np.arange(self.t.shape[0]), 4)
-            tidx = alltidx[indices[count == 1]]
+            # rows of allt are interleaved, so row k belongs to tetra k // 4
+            tidx = sel // 4
             triafunc = tetfunc[tidx]
-            return TriaMesh(self.v, tria), triafunc
-        return TriaMesh(self.v, tria)
+            return TriaMesh(v, tria), triafunc
+        return TriaMesh(v, tria)
 
     def rm_free_vertices_(self):
         """Remove unused (free) vertices from v and t.
@@ -234,7 +362,10 @@ class TetMesh:
         when constructing, e.g., Laplace matrices.
 
         Will update v and t in mesh.
-        Same implementation as in `~lapy.TriaMesh`.
+        Similar to `~lapy.TriaMesh`, but indices in t are not checked again
+        here, they are only validated on construction (see ``validate``).
+        Indices that exceed the number of vertices raise an ``IndexError``,
+        negative indices are not detected.
 
         Returns
         -------
@@ -243,13 +374,9 @@ class TetMesh:
         vdel: array
             Indices of deleted (unused) vertices.
         """
-        tflat = self.t.reshape(-1)
-        vnum = np.max(self.v.shape)
-        if np.max(tflat) >= vnum:
-            raise ValueError("Max index exceeds number of vertices")
+        vnum = self.v.shape[0]
         # determine which vertices to keep
-        vkeep = np.full(vnum, False, dtype=bool)
-        vkeep[tflat] = True
+        vkeep = self._used_vertex_mask()
         # list of deleted vertices (old indices)
         vdel = np.nonzero(~vkeep)[0]
         # if nothing to delete return
@@ -258,13 +385,14 @@ class TetMesh:
         # delete unused vertices
         vnew = self.v[vkeep, :]
         # create lookup table
-        tlookup = np.cumsum(vkeep) - 1
+        tlookup = np.cumsum(vkeep, dtype=self.t.dtype) - 1
         # reindex tria
         tnew = tlookup[self.t]
         # convert vkeep to index list
         vkeep = np.nonzero(vkeep)[0]
         self.v = vnew
         self.t = tnew
+        self._adj_sym = None
         return vkeep, vdel
 
     def orient_(self):
@@ -279,32 +407,20 @@ class TetMesh:
         onum : int
             Number of re-oriented tetras.
         """
-        # Compute vertex coordinates and a difference vector for each tetra:
-        t0 = self.t[:, 0]
-        t1 = self.t[:, 1]
-        t2 = self.t[:, 2]
-        t3 = self.t[:, 3]
-        v0 = self.v[t0, :]
-        v1 = self.v[t1, :]
-        v2 = self.v[t2, :]
-        v3 = self.v[t3, :]
-        e0 = v1 - v0
-        e2 = v2 - v0
-        e3 = v3 - v0
-        # Compute cross product and 6 * vol for each tetra:
-        cr = np.cross(e0, e2)
-        vol = np.sum(e3 * cr, axis=1)
+        # Compute 6 * vol for each tetra:
+        vol = _tet_volumes(self.v, self.t)
         negtet = vol < 0.0
         negnum = np.sum(negtet)
         if negnum == 0:
             print("Mesh is oriented, nothing to do")
             return 0
-        tnew = self.t
-        # negtet = np.where(negtet)
-        temp = self.t[negtet, 1]
-        tnew[negtet, 1] = self.t[negtet, 2]
-        tnew[negtet, 2] = temp
+        # swap t1 and t2 of negative tetras, on a copy as t may be shared
+        # with the caller
+        tnew = self.t.copy()
+        tnew[negtet, 1:3] = self.t[negtet, 2:0:-1]
+        self.t = tnew
         onum = np.sum(negtet)
         print("Flipped " + str(onum) + " tetrahedra")
-        self.__init__(self.v, tnew)
+        # no need to re-init: swapping t1 and t2 does not change the undirected
+        # edge set, so adj_sym stays valid
         return onum
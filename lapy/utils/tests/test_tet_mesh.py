@@ -51,6 +51,28 @@ def loaded_data():
     return expected_outcomes
 
 
+def test_validate(tet_mesh_fixture):
+    """
+    Testing index validation on construction of tet mesh
+    """
+    mesh = tet_mesh_fixture
+    with pytest.raises(ValueError):
+        TetMesh(mesh.v[:8], mesh.t)
+    unchecked = TetMesh(mesh.v[:8], mesh.t, validate=False)
+    assert unchecked.t.shape == mesh.t.shape
+
+
+def test_non_integer_indices(tet_mesh_fixture):
+    """
+    Testing that non-integer tetra indices are rejected
+    """
+    mesh = tet_mesh_fixture
+    with pytest.raises(ValueError):
+        TetMesh(mesh.v, [[0, 1, 2, 3], [0, 1, 2, 4.7]])
+    with pytest.raises(ValueError):
+        TetMesh(mesh.v, mesh.t.astype(float), validate=False)
+
+
 def test_has_free_vertices(tet_mesh_fixture):
     """
     Testing tet mesh has free vertices or not
@@ -77,6 +99,52 @@ def test_rm_free_vertices(tet_mesh_fixture, loaded_data):
     assert np.array_equal(deleted_vertices, expected_removed_vertices)
 
 
+def test_construct_adj_sym(tet_mesh_fixture):
+    """
+    Testing symmetric adjacency matrix of tet mesh
+    """
+    mesh = tet_mesh_fixture
+    adj = mesh.construct_adj_sym()
+    assert adj.shape == (9, 9)
+    assert (adj != adj.T).nnz == 0
+    # each tetra contributes its 6 edges in both directions
+    assert adj.sum() == 12 * mesh.t.shape[0]
+    # edge (0, 8) is shared by 5 tetrahedra
+    assert adj[0, 8] == 5
+
+
+def test_construct_adj_sym_large_indices():
+    """
+    Testing symmetric adjacency matrix with indices that overflow int32 keys
+    """
+    n = 60000
+    v = np.zeros((n, 3))
+    tets = np.array([[0, 1, 2, 3], [n - 4, n - 3, n - 2, n - 1], [1, 2, 3, n - 1]])
+    mesh = TetMesh(v, tets)
+    adj = mesh.construct_adj_sym()
+    assert adj.shape == (n, n)
+    assert adj.sum() == 12 * tets.shape[0]
+    assert adj[n - 4, n - 3] == 1
+    assert adj[n - 1, n - 2] == 1
+    assert adj[n - 1, 3] == 1
+    assert adj[1, 2] == 2
+
+
+def test_rm_free_vertices_adj_sym(tet_mesh_fixture):
+    """
+    Testing that removing free vertices resets the adjacency matrix
+    """
+    mesh = tet_mesh_fixture
+    avg_edge_length = mesh.avg_edge_length()
+    mesh = TetMesh(np.vstack((mesh.v, [[2.0, 2.0, 2.0]])), mesh.t)
+    assert mesh.adj_sym.shape == (10, 10)
+
+    _, deleted_vertices = mesh.rm_free_vertices_()
+    assert np.array_equal(deleted_vertices, [9])
+    assert mesh.adj_sym.shape == (len(mesh.v),) * 2
+    assert np.isclose(mesh.avg_edge_length(), avg_edge_length)
+
+
 def test_is_oriented(tet_mesh_fixture):
     """
     Testing whether test mesh orientations are consistent
@@ -89,6 +157,15 @@ def test_is_oriented(tet_mesh_fixture):
     ), f"Expected is_oriented result {expected_result}, but got {result}"
 
 
+def test_is_oriented_empty(tet_mesh_fixture, capsys):
+    """
+    Testing that an empty tet mesh is not reported as flipped
+    """
+    mesh = TetMesh(tet_mesh_fixture.v, np.empty((0, 4), dtype=int), validate=False)
+    assert mesh.is_oriented() is False
+    assert "flipped" not in capsys.readouterr().out
+
+
 def test_boundary_tria(tet_mesh_fixture):
     """
     Test computation of boundary triangles from tet mesh.
@@ -110,6 +187,36 @@ def test_boundary_tria(tet_mesh_fixture):
     ), f"Expected is_oriented result {expected_result}, but got {result}"
 
 
+def test_boundary_tria_tetfunc(tet_mesh_fixture):
+    """
+    Testing mapping of tetra function values to boundary triangles
+    """
+    mesh = tet_mesh_fixture
+    boundary_tria_mesh, triafunc = mesh.boundary_tria(np.arange(mesh.t.shape[0]))
+
+    assert triafunc.shape[0] == boundary_tria_mesh.t.shape[0]
+    # each boundary triangle is a face of the tetra it was mapped from
+    for tria, tidx in zip(boundary_tria_mesh.t, triafunc):
+        assert set(tria) <= set(mesh.t[tidx])
+
+
+def test_boundary_tria_compact(tet_mesh_fixture):
+    """
+    Testing boundary triangle mesh without interior vertices
+    """
+    mesh = tet_mesh_fixture
+    boundary_tria_mesh = mesh.boundary_tria()
+    compact_tria_mesh = mesh.boundary_tria(compact=True)
+
+    # the center vertex is not on the boundary
+    assert compact_tria_mesh.v.shape[0] == 8
+    assert not compact_tria_mesh.has_free_vertices()
+    assert np.array_equal(
+        compact_tria_mesh.v[compact_tria_mesh.t],
+        boundary_tria_mesh.v[boundary_tria_mesh.t],
+    )
+
+
 def test_avg_edge_length(tet_mesh_fixture):
     """
     Testing the computatoin of average edge length for tetrahedral mesh
@@ -160,6 +267,19 @@ def test_orient_and_check_oriented(tet_mesh_fixture):
     assert result == expected_oriented_result
 
 
+def test_orient_keeps_input(tet_mesh_fixture):
+    """
+    Testing that orienting does not modify the caller's index array
+    """
+    tets = tet_mesh_fixture.t.astype(np.int32)
+    tets_orig = tets.copy()
+    mesh = TetMesh(tet_mesh_fixture.v, tets)
+
+    assert mesh.orient_() == 1
+    assert np.array_equal(tets, tets_orig)
+    assert not np.array_equal(mesh.t, tets_orig)
+
+
 def test_correct_orientations_and_boundary(tet_mesh_fixture):
     """
     Testing correcting orientation and checking boundary surface orientation